@@ -0,0 +1,199 @@
+# bench_inventory.py
+"""
+库存数据结构与列表刷新的基准测试，独立运行，不属于程序本身。
+用法: python bench_inventory.py [--sizes 10000 100000] [--slots 5000]
+
+1. 内存：用 tracemalloc 对比旧的 "dict + 逐行复制" 与现在的 "InventoryRecord + 行号" 两种表示，
+   统计构建并显示一次列表时的峰值内存与存活的分配块数。
+2. Tk 调用：用只记录调用次数的 Treeview 替身，统计 10k 条目中只有 1 条变化时一次刷新的 Tk 调用数。
+3. GreenLuma：在临时目录中生成数千个槽位，测量索引加载、按修改时间复用以及批量修改的耗时与写入文件数。
+4. 首屏列表：在临时 Steam 目录中生成 10k 个lua文件，对比 "读取快照 + 首次填充列表" 与 "冷扫描 + 首次填充列表" 的耗时。
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from file_manager_backend import STATUS_OK, FileManagerBackend, GreenLumaAppList, InventoryRecord, InventoryStore
+from file_manager_gui import STATUS_TEXT, reconcile_treeview, render_row
+
+
+class RecordingTreeview:
+    """只记录调用次数与行顺序的 Treeview 替身，不保存显示值，以免影响内存统计。"""
+    def __init__(self):
+        self.children: list[str] = []
+        self.calls = 0
+
+    def get_children(self, item=""):
+        self.calls += 1
+        return tuple(self.children)
+
+    def delete(self, *iids):
+        self.calls += 1
+        removed = set(iids)
+        self.children = [iid for iid in self.children if iid not in removed]
+
+    def detach(self, *iids):
+        self.delete(*iids)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.calls += 1
+        if index == "end": self.children.append(iid)
+        else: self.children.insert(index, iid)
+        return iid
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.children.insert(index, iid)
+
+    def item(self, iid, **kwargs):
+        self.calls += 1
+
+    def yview(self):
+        self.calls += 1
+        return (0.0, 1.0)
+
+    def yview_moveto(self, fraction):
+        self.calls += 1
+
+
+def make_rows(count: int, changed: int | None = None) -> list[tuple[str, str, str, str]]:
+    """生成扫描结果的原始字段；changed 指定的那一行换一个名称，模拟一次只有单条变化的重新扫描。"""
+    return [(f"{i}.lua", str(i), STATUS_OK, "Changed Name" if i == changed else f"Game {i}") for i in range(count)]
+
+
+# ---- 旧的表示：每条记录一个 dict，显示时再为每行复制一份 dict 并逐行重建 Treeview ----
+
+def build_old(rows):
+    return [{'filename': f, 'appid': a, 'status': s, 'game_name': n} for f, a, s, n in rows]
+
+
+def render_old(treeview, data, list_view_data: dict):
+    treeview.delete(*treeview.get_children()); list_view_data.clear()
+    for data_item in data:
+        filename, appid, game_name = data_item.get('filename', ''), data_item.get('appid', ''), data_item.get('game_name', '')
+        values = (STATUS_TEXT.get(data_item.get('status'), ""), filename, appid, game_name)
+        treeview.insert("", "end", iid=appid, values=values, tags=())
+        if appid.isdigit(): list_view_data[appid] = {'treeview': treeview, 'item_id': appid, **data_item}
+
+
+# ---- 现在的表示：InventoryRecord + 行号，按 iid 与已显示的记录做增量调整 ----
+
+def build_new(rows):
+    return InventoryStore(InventoryRecord(f, a, s, game_name=n) for f, a, s, n in rows)
+
+
+def render_new(treeview, store: InventoryStore, view_rows: dict, row_cache: dict):
+    view_rows.clear(); desired = []
+    for row_id, record in enumerate(store):
+        desired.append(record.appid); view_rows[record.appid] = row_id
+    reconcile_treeview(treeview, row_cache, desired, lambda iid: store[view_rows[iid]] if iid in view_rows else None, render_row)
+
+
+def measure_memory(label: str, rows, build, render, *state):
+    treeview = RecordingTreeview()
+    tracemalloc.start()
+    data = build(rows)
+    render(treeview, data, *state)
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    print(f"  {label:<24} 峰值 {peak / 1024 / 1024:8.1f} MB   存活分配块 {blocks:>9,}")
+    return data
+
+
+def bench_memory(sizes):
+    print("[内存] 构建列表并显示一次")
+    for count in sizes:
+        rows = make_rows(count)  # 原始字符串在统计之外生成，两种表示共享
+        print(f" {count:,} 条:")
+        measure_memory("dict + 逐行复制", rows, build_old, render_old, {})
+        measure_memory("记录 + 行号", rows, build_new, render_new, {}, {})
+
+
+def bench_tk_calls(count: int = 10_000):
+    print(f"[Tk 调用] {count:,} 条中 1 条变化后的一次刷新")
+    old_tree, old_view = RecordingTreeview(), {}
+    render_old(old_tree, build_old(make_rows(count)), old_view)
+    old_tree.calls = 0
+    render_old(old_tree, build_old(make_rows(count, changed=count // 2)), old_view)
+    new_tree, view_rows, row_cache = RecordingTreeview(), {}, {}
+    render_new(new_tree, build_new(make_rows(count)), view_rows, row_cache)
+    new_tree.calls = 0
+    render_new(new_tree, build_new(make_rows(count, changed=count // 2)), view_rows, row_cache)
+    print(f"  {'删除后全部重新插入':<24} {old_tree.calls:>9,} 次")
+    print(f"  {'按 iid 增量调整':<24} {new_tree.calls:>9,} 次")
+
+
+def bench_greenluma(slots: int):
+    print(f"[GreenLuma] {slots:,} 个槽位")
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for slot in range(slots):
+            (directory / f"{slot}.txt").write_text(str(100000 + slot), encoding='utf-8')
+        applist = GreenLumaAppList(directory)
+        start = time.perf_counter(); applist.load()
+        print(f"  首次加载（读取全部槽位）     {(time.perf_counter() - start) * 1000:8.1f} ms")
+        previous = {f"{slot}.txt": (applist.mtimes[slot], appid) for slot, appid in applist.slots.items()}
+        start = time.perf_counter(); applist.load(previous)
+        print(f"  按修改时间复用后再次加载     {(time.perf_counter() - start) * 1000:8.1f} ms")
+        for label, add, remove in (("末尾追加 1 个", ["999999"], []),
+                                   ("删除最后 1 个", [], ["999999"]),
+                                   ("批量删除 100 个（靠前）", [], [str(100000 + slot) for slot in range(100)])):
+            start = time.perf_counter()
+            written = applist.apply_changes(add=add, remove=remove)[3]
+            print(f"  {label:<22} {(time.perf_counter() - start) * 1000:8.1f} ms   写入/删除 {written:,} 个文件")
+        assert len(os.listdir(directory)) == len(applist)
+
+
+def bench_snapshot(count: int = 10_000):
+    print(f"[首屏列表] {count:,} 个lua文件，从开始到列表可用")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # 快照与 config.json 都使用相对路径，放在临时目录中，不影响真实数据
+        try:
+            steam_path = Path(tmp) / "steam"
+            directory = steam_path / "config" / "stplug-in"
+            directory.mkdir(parents=True)
+            for i in range(count):
+                appid = 100000 + i
+                (directory / f"{appid}.lua").write_text(f'addappid({appid})\nsetManifestid({appid}, "{i}")\n', encoding='utf-8')
+            (directory / "steamtools.lua").write_text("".join(f"addappid({900000 + i}, 1)\n" for i in range(100)), encoding='utf-8')
+
+            backend = FileManagerBackend(); backend.steam_path = steam_path
+            backend.name_cache = {str(100000 + i): f"Game {i}" for i in range(count)}
+            start = time.perf_counter()
+            _, store, _ = backend.scan_steamtools()
+            for record in store: backend.fill_game_name(record)
+            render_new(RecordingTreeview(), store, {}, {})
+            cold = time.perf_counter() - start
+            backend.save_snapshot({"st": store, "gl": InventoryStore(), "assistant": InventoryStore()})
+
+            backend = FileManagerBackend(); backend.steam_path = steam_path
+            start = time.perf_counter()
+            snapshot = backend.load_snapshot()
+            render_new(RecordingTreeview(), snapshot["tabs"]["st"], {}, {})
+            warm = time.perf_counter() - start
+            previous = {record.filename: (record.mtime, record.appid) for record in snapshot["tabs"]["st"] if record.mtime}
+            start = time.perf_counter(); backend.scan_steamtools(previous)
+            rescan = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    print(f"  {'冷扫描 + 首次填充':<22} {cold * 1000:8.1f} ms   （文件已在系统缓存中，实际冷启动更慢）")
+    print(f"  {'读取快照 + 首次填充':<22} {warm * 1000:8.1f} ms")
+    print(f"  {'快照之后的后台同步扫描':<22} {rescan * 1000:8.1f} ms   （修改时间未变的文件不再读取）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="库存数据结构与列表刷新的基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="内存对比使用的条目数")
+    parser.add_argument("--slots", type=int, default=5000, help="GreenLuma 测试生成的槽位数")
+    parser.add_argument("--entries", type=int, default=10_000, help="首屏列表测试生成的lua文件数")
+    args = parser.parse_args()
+    bench_memory(args.sizes)
+    bench_tk_calls()
+    bench_greenluma(args.slots)
+    bench_snapshot(args.entries)
@@ -1,13 +1,23 @@
 # file_manager_backend.py
 
 import os
+import re
+import sys
 import json
+import locale
 import winreg
+import functools
 import traceback
 from pathlib import Path
 import asyncio
+import tempfile
 import httpx
-from typing import Dict
+from typing import Callable, Dict, Iterable, Iterator
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None  # 未安装 pypinyin 时，中文名称按系统区域设置排序
 
 # 默认配置，确保即使没有config.json也能运行
 DEFAULT_CONFIG = {
@@ -16,6 +26,266 @@ DEFAULT_CONFIG = {
     "steamtools_only_lua": False,
 }
 
+SNAPSHOT_VERSION = 1
+# 这些名称只是临时状态，不写入快照
+TRANSIENT_NAMES = {"Loading...", "Fetch Error"}
+# 这些名称不是真正的游戏名，排序时统一放在最后
+PLACEHOLDER_NAMES = TRANSIENT_NAMES | {"Name Not Found", "Name N/A", "Invalid AppID"}
+
+# 清单版本模式：注释掉 setManifestid 即为自动更新，取消注释即为固定版本
+MANIFEST_FIXED_PATTERN = re.compile(r'--\s*(setManifestid\s*\()')
+MANIFEST_AUTO_PATTERN = re.compile(r'^(setManifestid\s*\()', re.MULTILINE)
+ST_APPID_PATTERN = re.compile(r'addappid\s*\(\s*(\d+)')
+ST_UNLOCK_PATTERN = re.compile(r'addappid\s*\(\s*(\d+)\s*,\s*1\s*\)')
+
+
+# 条目状态。状态字符串会被 intern，所有记录共享同一个对象
+STATUS_OK = sys.intern("ok")
+STATUS_UNLOCKED_ONLY = sys.intern("unlocked_only")
+STATUS_CORE_FILE = sys.intern("core_file")
+
+
+def atomic_write_text(path: Path, content: str):
+    """先写入同目录下的临时文件，再用 os.replace 原子替换目标文件。"""
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8', dir=path.parent, suffix='.tmp') as temp_f:
+        temp_f.write(content)
+        temp_path = temp_f.name
+    try:
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def set_manifest_mode(path: Path, to_fixed: bool) -> bool:
+    """把lua文件切换为固定版本/自动更新模式。内容无变化时不写入并返回 False。"""
+    path = Path(path)
+    content = path.read_text(encoding='utf-8', errors='ignore')
+    if to_fixed:
+        new_content = MANIFEST_FIXED_PATTERN.sub(r'\1', content)
+    else:
+        new_content = MANIFEST_AUTO_PATTERN.sub(r'--\1', content)
+    if new_content == content:
+        return False
+    atomic_write_text(path, new_content)
+    return True
+
+
+class InventoryRecord:
+    """库存中的一个条目。使用 __slots__ 避免每条记录都带一个 dict。"""
+    __slots__ = ('filename', 'appid', 'status', 'mtime', 'game_name')
+
+    def __init__(self, filename: str, appid: str, status: str, mtime: float = 0, game_name: str = "Loading..."):
+        self.filename = filename
+        self.appid = appid
+        self.status = sys.intern(status)
+        self.mtime = mtime
+        self.game_name = game_name
+
+    def key(self) -> tuple:
+        """用于判断扫描前后条目是否发生变化（不含游戏名称）。"""
+        return (self.filename, self.appid, self.status, self.mtime)
+
+    def __repr__(self) -> str:
+        return f"InventoryRecord({self.filename!r}, {self.appid!r}, {self.status!r})"
+
+
+class InventoryStore:
+    """
+    单个列表（SteamTools/GreenLuma/入库助手）的记录存储。
+    行号 (row id) 就是记录在 records 中的下标，界面只保存行号而不复制记录。
+    """
+    def __init__(self, records: Iterable[InventoryRecord] = ()):
+        self.records: list[InventoryRecord] = list(records)
+        self.rows_by_appid: Dict[str, list[int]] = {}
+        for row_id, record in enumerate(self.records):
+            self.rows_by_appid.setdefault(record.appid, []).append(row_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[InventoryRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, row_id: int) -> InventoryRecord:
+        return self.records[row_id]
+
+    def same_entries(self, other: 'InventoryStore') -> bool:
+        return len(self.records) == len(other.records) and all(a.key() == b.key() for a, b in zip(self.records, other.records))
+
+    def set_game_name(self, appid: str, game_name: str) -> list[int]:
+        """更新某个AppID所有条目的名称，返回受影响的行号。"""
+        rows = self.rows_by_appid.get(appid, [])
+        for row_id in rows:
+            self.records[row_id].game_name = game_name
+        return rows
+
+    def appids(self) -> Iterable[str]:
+        return self.rows_by_appid.keys()
+
+
+# --- 排序键 ---
+# 排序键按值缓存，同名/同文件名的记录只计算一次；可在后台线程中调用。
+# 每个排序键都是 (分组, 值)：降序只作用于值，分组 1（占位名称、无效AppID）无论升降序都排在最后。
+
+STATUS_SORT_RANK = {STATUS_CORE_FILE: 0, STATUS_OK: 1, STATUS_UNLOCKED_ONLY: 2}
+_DIGIT_RUN_PATTERN = re.compile(r'(\d+)')
+
+
+@functools.lru_cache(maxsize=65536)
+def name_sort_key(name: str) -> tuple:
+    """游戏名称的排序键：中文按拼音（需要 pypinyin），否则按区域设置排序；占位名称排在最后。"""
+    if not name or name in PLACEHOLDER_NAMES:
+        return (1, "")
+    text = name.casefold()
+    if lazy_pinyin is not None:
+        text = "".join(lazy_pinyin(text))
+    try:
+        return (0, locale.strxfrm(text))
+    except Exception:
+        return (0, text)
+
+
+@functools.lru_cache(maxsize=65536)
+def natural_sort_key(text: str) -> tuple:
+    """自然排序：'2.txt' 排在 '10.txt' 之前。"""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part.casefold()) for part in _DIGIT_RUN_PATTERN.split(text) if part)
+
+
+def appid_sort_key(appid: str) -> tuple:
+    return (0, int(appid)) if appid.isdigit() else (1, 0)
+
+
+SORT_KEY_FUNCS = {
+    'status': lambda record: (0, STATUS_SORT_RANK.get(record.status, 3)),
+    'filename': lambda record: (0, natural_sort_key(record.filename)),
+    'appid': lambda record: appid_sort_key(record.appid),
+    'game_name': lambda record: name_sort_key(record.game_name),
+}
+
+
+def sort_rows(store: 'InventoryStore', row_ids: Iterable[int], sort_spec: list[tuple[str, bool]]) -> list[int]:
+    """
+    按 sort_spec（[(列名, 是否降序), ...]，主键在前）对行号做稳定的多键排序。
+    从最次要的键开始依次排序，利用排序的稳定性得到多键结果。
+    每一轮先按值排序（可降序），再按分组做一次稳定的升序排序，使分组 1 的行始终排在最后。
+    """
+    rows = sorted(row_ids)
+    for column, descending in reversed(sort_spec):
+        key_func = SORT_KEY_FUNCS[column]
+        keys = {row_id: key_func(store.records[row_id]) for row_id in rows}  # 每行的排序键只计算一次
+        rows.sort(key=lambda row_id: keys[row_id][1], reverse=descending)
+        rows.sort(key=lambda row_id: keys[row_id][0])
+    return rows
+
+
+class GreenLumaAppList:
+    """
+    GreenLuma AppList 目录的索引。
+    AppList 中的文件是按序号编号的槽位 (0.txt, 1.txt, ...)，文件内容才是真正的AppID。
+    索引同时维护 槽位->AppID 与 AppID->槽位 两个映射，批量增删后统一做一次重新编号。
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.slots: Dict[int, str] = {}          # 槽位号 -> AppID，按槽位号升序
+        self.appid_to_slot: Dict[str, int] = {}  # AppID -> 槽位号（重复条目取第一个）
+        self.mtimes: Dict[int, float] = {}       # 槽位号 -> 文件修改时间
+        self.unreadable: set[int] = set()        # 读取失败的槽位，其内容只是占位符
+
+    def load(self, previous: Dict[str, tuple[float, str]] | None = None) -> bool:
+        """
+        一次性读取所有槽位文件的内容。目录不存在时返回 False。
+        previous 为 {文件名: (mtime, AppID)}，修改时间未变的槽位直接复用旧内容，不再读取文件。
+        """
+        entries: Dict[int, str] = {}
+        self.mtimes, self.unreadable = {}, set()
+        if not self.directory.is_dir():
+            self.slots, self.appid_to_slot = {}, {}
+            return False
+        previous = previous or {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith('.txt') or not name[:-4].isdigit() or not entry.is_file():
+                    continue
+                slot = int(name[:-4])
+                try:
+                    mtime = entry.stat().st_mtime
+                    cached = previous.get(name)
+                    if cached and cached[0] == mtime:
+                        entries[slot] = cached[1]
+                    else:
+                        with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+                            entries[slot] = f.read().strip()
+                    self.mtimes[slot] = mtime
+                except OSError:
+                    entries[slot] = "ReadError"
+                    self.unreadable.add(slot)
+        self.slots = dict(sorted(entries.items()))
+        self._rebuild_reverse_map()
+        return True
+
+    def _rebuild_reverse_map(self):
+        self.appid_to_slot = {}
+        for slot, appid in self.slots.items():
+            self.appid_to_slot.setdefault(appid, slot)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, appid: str) -> bool:
+        return appid in self.appid_to_slot
+
+    def apply_changes(self, add: Iterable[str] = (), remove: Iterable[str] = ()) -> tuple[int, int, int, int]:
+        """
+        批量添加/删除AppID，并在一次 O(n) 的压缩过程中把槽位重新编号为 0..n-1。
+        只重写内容发生变化的槽位，多余的槽位文件会被删除；重复、空白或非数字的条目会被一并清理。
+        有槽位读取失败时抛出 OSError 且不做任何修改，以免把占位内容写回 AppList。
+        返回 (添加数, 删除数, 清理的重复/无效条目数, 写入或删除的文件数)。
+        """
+        if self.unreadable:
+            slots = ", ".join(f"{slot}.txt" for slot in sorted(self.unreadable))
+            raise OSError(f"无法读取槽位 {slots}，为避免损坏 AppList 已取消修改。")
+        remove_set = set(remove)
+        ordered, seen = [], set()
+        removed_count = cleaned_count = 0
+        for appid in self.slots.values():
+            if appid in remove_set:
+                removed_count += 1
+                continue
+            if not appid.isdigit() or appid in seen:  # 顺便清理重复和无效条目
+                cleaned_count += 1
+                continue
+            seen.add(appid)
+            ordered.append(appid)
+        added_count = 0
+        for appid in add:
+            if appid.isdigit() and appid not in seen:
+                seen.add(appid)
+                ordered.append(appid)
+                added_count += 1
+
+        new_slots = dict(enumerate(ordered))
+        if new_slots == self.slots:
+            return added_count, removed_count, cleaned_count, 0
+        written_count = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for slot, appid in new_slots.items():
+            if self.slots.get(slot) != appid:
+                atomic_write_text(self.directory / f"{slot}.txt", appid)
+                self.mtimes.pop(slot, None)
+                written_count += 1
+        for slot in self.slots:
+            if slot not in new_slots:
+                (self.directory / f"{slot}.txt").unlink(missing_ok=True)
+                self.mtimes.pop(slot, None)
+                written_count += 1
+        self.slots = new_slots
+        self._rebuild_reverse_map()
+        return added_count, removed_count, cleaned_count, written_count
+
+
 class FileManagerBackend:
     """
     一个精简的后端，为文件管理器服务。
@@ -43,6 +313,9 @@ class FileManagerBackend:
     def get_config_path(self) -> Path:
         return Path('./config.json')
 
+    def get_snapshot_path(self) -> Path:
+        return Path('./inventory_snapshot.json')
+
     def load_config(self):
         config_path = self.get_config_path()
         if not config_path.exists():
@@ -69,6 +342,54 @@ class FileManagerBackend:
             self._log_error(f"保存配置失败: {e}")
             raise
 
+    def load_snapshot(self) -> dict | None:
+        """
+        读取上次保存的库存快照，用于启动时立即显示列表。
+        快照格式: {"version", "steam_path", "names": {appid: name}, "tabs": {list_type: [[filename, appid, status, mtime], ...]}}
+        返回的 "tabs" 已转换为 {list_type: InventoryStore}。
+        """
+        snapshot_path = self.get_snapshot_path()
+        if not snapshot_path.exists():
+            return None
+        try:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                self._log_info('库存快照版本不匹配，已忽略。')
+                return None
+            for appid, name in snapshot.get("names", {}).items():
+                self.name_cache.setdefault(appid, name)
+            snapshot["tabs"] = {
+                list_type: InventoryStore(self.fill_game_name(InventoryRecord(filename, appid, status, mtime)) for filename, appid, status, mtime in rows)
+                for list_type, rows in snapshot.get("tabs", {}).items()
+            }
+            return snapshot
+        except Exception as e:
+            self._log_error(f"库存快照加载失败: {e}")
+            return None
+
+    def save_snapshot(self, file_data: Dict[str, 'InventoryStore']):
+        """把当前库存和已获取到的游戏名称保存为紧凑的快照文件。保存失败只记录日志，不会抛出异常。"""
+        try:
+            tabs = {
+                list_type: [[record.filename, record.appid, record.status, record.mtime] for record in store]
+                for list_type, store in file_data.items()
+            }
+            # 名称缓存会被名称获取线程同时写入，先复制再遍历；失败或占位的名称不写入快照，下次启动时重新获取
+            names = {appid: name for appid, name in self.name_cache.copy().items() if name not in TRANSIENT_NAMES}
+            snapshot = {"version": SNAPSHOT_VERSION, "steam_path": str(self.steam_path), "names": names, "tabs": tabs}
+            atomic_write_text(self.get_snapshot_path(), json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')))
+        except Exception as e:
+            self._log_error(f"保存库存快照失败: {e}")
+
+    def fill_game_name(self, record: InventoryRecord) -> InventoryRecord:
+        """用名称缓存填充记录的游戏名称。"""
+        if record.status == STATUS_CORE_FILE:
+            record.game_name = "SteamTools Core File"
+        elif record.appid in self.name_cache:
+            record.game_name = self.name_cache[record.appid]
+        return record
+
     async def fetch_game_name(self, appid: str) -> str:
         """异步获取游戏名称，并使用缓存。"""
         if not appid or not appid.isdigit():
@@ -136,4 +457,139 @@ class FileManagerBackend:
         return self.steam_path / "config" / "stplug-in" if self.steam_path.exists() else None
 
     def get_greenluma_applist_path(self) -> Path | None:
-        return self.steam_path / "AppList" if self.steam_path.exists() else None
\ No newline at end of file
+        return self.steam_path / "AppList" if self.steam_path.exists() else None
+
+    def get_list_directory(self, list_type: str) -> Path | None:
+        """列表对应的目录：SteamTools 与入库助手共用 stplug-in 目录。"""
+        return self.get_greenluma_applist_path() if list_type == "gl" else self.get_steamtools_plugin_path()
+
+    def directory_signature(self, list_type: str) -> tuple | None:
+        """
+        判断列表是否需要重新扫描的签名。目录不存在时返回 None。
+        目录的修改时间只在增删文件时改变，因此再加上会被原地修改的文件：
+        SteamTools 为 steamtools.lua 的修改时间，GreenLuma 为所有槽位文件修改时间之和（Windows 上 scandir 自带修改时间，无需逐个 stat）。
+        """
+        directory = self.get_list_directory(list_type)
+        if not directory:
+            return None
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+            if list_type == "st":
+                st_lua_path = directory / "steamtools.lua"
+                return dir_mtime, st_lua_path.stat().st_mtime_ns if st_lua_path.exists() else 0
+            if list_type == "gl":
+                with os.scandir(directory) as it:
+                    return dir_mtime, sum(entry.stat().st_mtime_ns for entry in it
+                                          if entry.name.endswith(".txt") and entry.name[:-4].isdigit())
+            return dir_mtime, 0
+        except OSError:
+            return None
+
+    def probe_tabs(self) -> Dict[str, bool]:
+        """廉价探测入库助手/GreenLuma 目录中是否有文件，找到第一个即停止，用于决定标签页是否显示。"""
+        def has_file(directory: Path | None, matches: Callable[[str], bool]) -> bool:
+            if not directory or not directory.is_dir():
+                return False
+            try:
+                with os.scandir(directory) as it:
+                    return any(matches(entry.name) for entry in it)
+            except OSError:
+                return False
+        return {
+            "assistant": has_file(self.get_steamtools_plugin_path(), lambda name: name.endswith(".o")),
+            "gl": has_file(self.get_greenluma_applist_path(), lambda name: name.endswith(".txt") and name[:-4].isdigit()),
+        }
+
+    # --- 目录扫描 ---
+    # 以下扫描函数不触碰任何UI，可在后台线程中执行。
+    # 返回 (found, store, errors)，store 为 InventoryStore。
+    # previous 为 {文件名: (mtime, AppID)}，修改时间未变的文件直接复用上次解析出的AppID。
+    # on_appid 在每发现一个AppID时立即调用（在扫描线程中），便于名称获取无需等待扫描结束。
+
+    def _extract_st_appid(self, file_path: Path) -> str:
+        try:
+            content = file_path.read_text(encoding='utf-8', errors='ignore')
+            match = ST_APPID_PATTERN.search(content)
+            return match.group(1) if match else "N/A"
+        except Exception:
+            return "ReadError"
+
+    def scan_steamtools(self, previous: Dict[str, tuple[float, str]] | None = None,
+                        on_appid: Callable[[str], None] | None = None) -> tuple[bool, InventoryStore, list]:
+        directory = self.get_steamtools_plugin_path()
+        if not directory or not directory.exists():
+            return False, InventoryStore(), []
+        previous = previous or {}
+        loaded_data, errors = [], []
+        file_data_map = {}  # Maps appid -> data dictionary
+
+        # 1. Process all .lua files first. Their existence means 'Normal' status.
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    filename = entry.name
+                    if not filename.endswith(".lua") or filename == "steamtools.lua":
+                        continue
+                    mtime = entry.stat().st_mtime
+                    cached = previous.get(filename)
+                    appid = cached[1] if cached and cached[0] == mtime else self._extract_st_appid(directory / filename)
+                    if appid.isdigit():
+                        # We found a file, so it's 'ok' (Normal).
+                        file_data_map[appid] = InventoryRecord(filename, appid, STATUS_OK, mtime)
+                        if on_appid:
+                            on_appid(appid)
+        except Exception as e:
+            errors.append(f"读取stplug-in目录失败: {e}")
+
+        # 2. Process steamtools.lua for 'Unlocked Only' entries and the core file itself.
+        st_lua_path = directory / "steamtools.lua"
+        if st_lua_path.exists():
+            try:
+                loaded_data.append(InventoryRecord("steamtools.lua", "N/A", STATUS_CORE_FILE, st_lua_path.stat().st_mtime))
+                content = st_lua_path.read_text(encoding='utf-8', errors='ignore')
+                # 3. Find appids that are unlocked but have no corresponding .lua file.
+                for appid in set(ST_UNLOCK_PATTERN.findall(content)):
+                    if appid not in file_data_map:
+                        file_data_map[appid] = InventoryRecord(f"缺少 {appid}.lua", appid, STATUS_UNLOCKED_ONLY)
+                        if on_appid:
+                            on_appid(appid)
+            except Exception as e:
+                errors.append(f"读取 steamtools.lua 失败: {e}")
+
+        # 4. Core file first, then all other items sorted by appid.
+        loaded_data.extend(sorted(file_data_map.values(), key=lambda record: int(record.appid), reverse=True))
+        return True, InventoryStore(loaded_data), errors
+
+    def scan_assistant(self, on_appid: Callable[[str], None] | None = None) -> tuple[bool, InventoryStore, list]:
+        directory = self.get_steamtools_plugin_path()
+        if not directory or not directory.exists():
+            return False, InventoryStore(), []
+        try:
+            with os.scandir(directory) as it:
+                files = [(entry.name, entry.stat().st_mtime) for entry in it if entry.name.endswith(".o")]
+        except Exception as e:
+            return False, InventoryStore(), [f"读取目录 {directory} 时发生错误:\n{e}"]
+        files.sort(key=lambda f: f[1], reverse=True)
+        store = InventoryStore(InventoryRecord(filename, Path(filename).stem, STATUS_OK, mtime) for filename, mtime in files)
+        if on_appid:
+            for appid in store.appids():
+                on_appid(appid)
+        return bool(store), store, []
+
+    def scan_greenluma(self, previous: Dict[str, tuple[float, str]] | None = None,
+                       on_appid: Callable[[str], None] | None = None) -> tuple[bool, InventoryStore, list]:
+        directory = self.get_greenluma_applist_path()
+        if not directory or not directory.exists():
+            return False, InventoryStore(), []
+        applist = GreenLumaAppList(directory)
+        try:
+            applist.load(previous)
+        except Exception as e:
+            return False, InventoryStore(), [f"读取目录 {directory} 时发生错误:\n{e}"]
+        # 槽位文件名只是序号，AppID 取自文件内容
+        store = InventoryStore(InventoryRecord(f"{slot}.txt", appid, STATUS_OK, applist.mtimes.get(slot, 0))
+                               for slot, appid in applist.slots.items())
+        if on_appid:
+            for appid in store.appids():
+                on_appid(appid)
+        return bool(store), store, []
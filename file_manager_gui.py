@@ -3,6 +3,7 @@
 import sys
 import os
 import re
+import locale
 import webbrowser
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, filedialog, simpledialog
@@ -13,6 +14,8 @@ import asyncio
 import queue
 import shutil
 import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 try:
     import ttkbootstrap as ttk
@@ -22,7 +25,7 @@ except ImportError:
     sys.exit(1)
 
 try:
-    from file_manager_backend import FileManagerBackend
+    from file_manager_backend import FileManagerBackend, GreenLumaAppList, InventoryRecord, InventoryStore, set_manifest_mode, sort_rows
 except ImportError:
     print("错误: file_manager_backend.py 文件缺失。")
     sys.exit(1)
@@ -36,6 +39,89 @@ except ImportError:
     print("请使用 'pip install pygments tklinenums' 命令安装。")
     lex = None
 
+def _longest_increasing_subsequence(seq: list[int]) -> set[int]:
+    """返回 seq 的一个最长递增子序列的下标集合，用于找出无需移动的行。"""
+    tails, tail_idx, prev = [], [], [-1] * len(seq)
+    for i, value in enumerate(seq):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < value: lo = mid + 1
+            else: hi = mid
+        if lo > 0: prev[i] = tail_idx[lo - 1]
+        if lo == len(tails): tails.append(value); tail_idx.append(i)
+        else: tails[lo] = value; tail_idx[lo] = i
+    result, i = set(), tail_idx[-1] if tail_idx else -1
+    while i != -1: result.add(i); i = prev[i]
+    return result
+
+
+EMPTY_ROW_IID = "__empty__"
+STATUS_TEXT = {'unlocked_only': "仅解锁", 'core_file': "仅解锁储存lua", 'ok': "已入库"}
+STATUS_TAGS = {'unlocked_only': ("UNLOCKED_ONLY",), 'core_file': ("CORE_FILE",)}
+
+
+def format_treeview_values(record: InventoryRecord) -> tuple:
+    return (STATUS_TEXT.get(record.status, ""), record.filename, record.appid, record.game_name)
+
+
+def render_row(record: InventoryRecord | None) -> tuple[tuple, tuple]:
+    """一行的 (values, tags)；record 为 None 时是空列表的提示行。"""
+    if record is None: return ("", " (列表为空)", "", ""), ()
+    return format_treeview_values(record), STATUS_TAGS.get(record.status, ())
+
+
+def _same_display(shown, record) -> bool:
+    """两条记录在列表中显示的内容是否相同；同一对象直接视为相同，不构造任何元组。"""
+    if shown is record: return True
+    if shown is None or record is None: return False
+    return shown.filename == record.filename and shown.appid == record.appid and shown.status == record.status and shown.game_name == record.game_name
+
+
+def reconcile_treeview(treeview, row_cache: dict, desired: list[str], record_of, render) -> int:
+    """
+    把 Treeview 调整为 desired（按显示顺序的 iid 列表）描述的内容，而不是删除重建：
+    只删除、插入、更新或移动有变化的行，其余行连同选择状态一起保留。
+    record_of(iid) 返回该行的记录（空列表提示行为 None）；render(record) 返回 (values, tags)，
+    只对插入或内容变化的行调用，刷新时不再为每一行构造值元组。
+    row_cache 为 {iid: 记录}，记录每行当前显示的内容，避免逐行向 Tk 查询。
+    已处于正确相对顺序的行（最长递增子序列）保持不动。返回调用的 Tk 命令数。
+    """
+    current = treeview.get_children(); calls = 1
+    desired_iids = set(desired)
+    stale = [iid for iid in current if iid not in desired_iids]
+    if stale:
+        treeview.delete(*stale); calls += 1
+        for iid in stale: row_cache.pop(iid, None)
+    position = {iid: i for i, iid in enumerate(iid for iid in current if iid in desired_iids)}
+    kept = [iid for iid in desired if iid in position]
+    keep = _longest_increasing_subsequence([position[iid] for iid in kept])
+    moving = {iid for k, iid in enumerate(kept) if k not in keep}
+    # 记住顶部可见的行，结构变化后滚回原处
+    top_iid = None
+    if stale or moving or len(kept) != len(desired):
+        first = treeview.yview()[0]; calls += 1
+        top_index = int(first * len(current) + 0.5)
+        if first > 0 and top_index < len(current): top_iid = current[top_index]
+    if moving: treeview.detach(*moving); calls += 1
+    for index, iid in enumerate(desired):
+        record = record_of(iid)
+        if iid not in position:
+            values, tags = render(record)
+            treeview.insert("", index, iid=iid, values=values, tags=tags); row_cache[iid] = record; calls += 1
+            continue
+        if iid in moving: treeview.move(iid, "", index); calls += 1
+        shown = row_cache.get(iid)
+        if shown is record: continue
+        if not _same_display(shown, record):
+            values, tags = render(record)
+            treeview.item(iid, values=values, tags=tags); calls += 1
+        row_cache[iid] = record  # 内容相同但来自新的扫描结果时也换成新记录，旧列表可以被回收
+    if top_iid in desired_iids:
+        treeview.yview_moveto(desired.index(top_iid) / len(desired)); calls += 1
+    return calls
+
+
 class CodeEditor(scrolledtext.ScrolledText):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -160,7 +246,7 @@ class SimpleNotepad(tk.Toplevel):
         try:
             with open(self.file_path, "w", encoding="utf-8", errors="ignore") as f: f.write(self.text_widget.get("1.0", tk.END))
             messagebox.showinfo("成功", f"文件 {self.filename} 已保存。", parent=self)
-            self.master.refresh_file_lists()
+            self.master.refresh_file_lists([self.master.get_active_context()[2]])
         except Exception as e: messagebox.showerror("失败", f"保存文件失败: {e}", parent=self)
 
 
@@ -219,12 +305,29 @@ class SettingsDialog(tk.Toplevel):
 class FileManagerGUI(ttk.Window):
     def __init__(self):
         super().__init__(themename="darkly", title="cai入库文件管理器V2 1.3by pvzcxw")
+        self.start_time = time.perf_counter()
         self.geometry("1100x700"); self.minsize(800, 450); self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.backend = FileManagerBackend()
-        self.full_file_data = {"st": [], "gl": [], "assistant": []}
-        self.list_view_data = {}; self.name_queue = queue.Queue(); self.fetcher_thread = None
+        self.full_file_data = {"st": InventoryStore(), "gl": InventoryStore(), "assistant": InventoryStore()}
+        # 每个列表已显示的行: iid -> 行号；list_view_type 为当前显示的列表
+        self.list_view_type = ""; self.view_rows: dict[str, dict[str, int]] = {"st": {}, "gl": {}, "assistant": {}}
+        # 按需加载：列表在首次切换到时才扫描；dirty 标记只由该列表自身目录的变化触发
+        self.tab_dirty = {"st": True, "gl": True, "assistant": True}; self.tab_signature: dict[str, tuple | None] = {}
+        self.tab_generation = {"st": 0, "gl": 0, "assistant": 0}; self.rendered_state: dict[str, tuple] = {}
+        self.row_cache: dict[str, dict[str, InventoryRecord | None]] = {"st": {}, "gl": {}, "assistant": {}}  # 每个列表已显示行对应的记录
+        self.name_queue = queue.Queue(); self.task_queue = queue.Queue(); self.manifest_job_running = False
+        # 名称获取使用常驻的事件循环线程，发现AppID后即可提交，无需等待扫描结束
+        self.fetch_loop = asyncio.new_event_loop(); self.fetch_semaphore = asyncio.Semaphore(16)
+        self.pending_names: set[str] = set(); self.pending_names_lock = threading.Lock()
+        threading.Thread(target=self.fetch_loop.run_forever, daemon=True).start()
+        self.pending_scans = 0; self.changed_since_save = False
+        self.snapshot_future: Future | None = None; self.steam_path_detected = False; self.scanned_types: set[str] = set()
+        self.startup_timings: dict[str, tuple[float, float]] | None = {}  # 阶段 -> (开始, 结束)，相对启动时间
+        # 排序状态：每个列表的排序规则 [(列名, 是否降序), ...]，以及最近一次排序结果 (store, 行号顺序)
+        self.sort_specs = {"st": [], "gl": [], "assistant": []}; self.sorted_rows = {}
+        self.sort_generation = 0; self.sort_pending = False
         self.create_menu(); self.create_widgets()
-        self.after(100, self.initialize_app); self.process_name_queue()
+        self.load_snapshot_async(); self.initialize_app(); self.process_name_queue(); self.process_task_queue()
 
     def create_menu(self):
         menu_bar = ttk.Menu(self); self.config(menu=menu_bar)
@@ -232,6 +335,9 @@ class FileManagerGUI(ttk.Window):
         self.file_menu.add_command(label="🔄 刷新所有列表", command=self.refresh_file_lists); self.file_menu.add_separator()
         self.file_menu.add_command(label="📂 打开插件目录 (ST/助手)", command=lambda: self.open_folder('st_assistant'))
         self.gl_folder_label = "📂 打开GreenLuma目录"; self.file_menu.add_command(label=self.gl_folder_label, command=lambda: self.open_folder('gl'), state="disabled")
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="✅ 全部转换为固定版本 (ST)", command=lambda: self.bulk_toggle_manifest_version(None, to_fixed=True))
+        self.file_menu.add_command(label="🔄 全部转换为自动更新 (ST)", command=lambda: self.bulk_toggle_manifest_version(None, to_fixed=False))
         self.file_menu.add_separator(); self.file_menu.add_command(label="退出", command=self.on_closing)
         help_menu = ttk.Menu(menu_bar, tearoff=False); menu_bar.add_cascade(label="帮助", menu=help_menu)
         help_menu.add_command(label="关于", command=self.show_about_dialog)
@@ -245,6 +351,9 @@ class FileManagerGUI(ttk.Window):
         adv_menu = tk.Menu(adv_menu_button, tearoff=0)
         adv_menu.add_command(label="强制解锁AppID", command=lambda: self.manual_modify_unlock('add'))
         adv_menu.add_command(label="删除解锁AppID", command=lambda: self.manual_modify_unlock('remove'))
+        adv_menu.add_separator()
+        adv_menu.add_command(label="添加GreenLuma AppID", command=lambda: self.manual_modify_greenluma('add'))
+        adv_menu.add_command(label="删除GreenLuma AppID", command=lambda: self.manual_modify_greenluma('remove'))
         adv_menu_button["menu"] = adv_menu
         refresh_btn = ttk.Button(button_frame, text="🔄 刷新", command=self.refresh_file_lists, style="info.TButton"); refresh_btn.pack(side=LEFT, expand=True, fill=X, padx=(0, 2))
         view_btn = ttk.Button(button_frame, text="📝 查看/编辑", command=self.view_selected_file, style="success.TButton"); view_btn.pack(side=LEFT, expand=True, fill=X, padx=2)
@@ -257,57 +366,102 @@ class FileManagerGUI(ttk.Window):
         self.notebook = ttk.Notebook(main_frame); self.notebook.pack(fill=BOTH, expand=True, pady=(5,0))
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
         self.st_tab = ttk.Frame(self.notebook, padding=10)
-        self.st_file_list = self._create_treeview_in_frame(self.st_tab)
+        self.st_file_list = self._create_treeview_in_frame(self.st_tab, "st")
         self.notebook.add(self.st_tab, text="已入库文件 (SteamTools)")
-        self.gl_tab = ttk.Frame(self.notebook, padding=10); self.gl_file_list = self._create_treeview_in_frame(self.gl_tab)
-        self.assistant_tab = ttk.Frame(self.notebook, padding=10); self.assistant_file_list = self._create_treeview_in_frame(self.assistant_tab)
+        self.gl_tab = ttk.Frame(self.notebook, padding=10); self.gl_file_list = self._create_treeview_in_frame(self.gl_tab, "gl")
+        self.assistant_tab = ttk.Frame(self.notebook, padding=10); self.assistant_file_list = self._create_treeview_in_frame(self.assistant_tab, "assistant")
         self.status_bar = ttk.Label(self, text=" 正在初始化...", relief=SUNKEN, anchor=W, padding=5); self.status_bar.pack(side=BOTTOM, fill=X)
         
     def show_settings_dialog(self): SettingsDialog(self)
 
     def on_closing(self):
         print("正在关闭应用程序...")
-        if self.fetcher_thread and self.fetcher_thread.is_alive(): print("后台任务仍在运行，等待其自然结束...")
-        shutdown_thread = threading.Thread(target=lambda: asyncio.run(self.backend.close_client())); shutdown_thread.start()
-        self.destroy()
+        if self.pending_names: print("后台任务仍在运行，等待其自然结束...")
+        try:
+            self.backend.save_snapshot(self.full_file_data)
+            close_future = asyncio.run_coroutine_threadsafe(self.backend.close_client(), self.fetch_loop)
+            close_future.add_done_callback(lambda f: self.fetch_loop.call_soon_threadsafe(self.fetch_loop.stop))
+        except Exception as e: print(f"关闭时清理失败: {e}")
+        finally: self.destroy()
 
     def process_name_queue(self):
         try:
             while not self.name_queue.empty():
                 appid, game_name = self.name_queue.get_nowait()
-                for key in self.full_file_data:
-                    for item in self.full_file_data[key]:
-                        if item['appid'] == appid: item['game_name'] = game_name
-                if appid in self.list_view_data:
-                    item_data = self.list_view_data[appid]
-                    item_data['game_name'] = game_name
-                    treeview, item_id = item_data['treeview'], item_data['item_id']
-                    if treeview.exists(item_id):
-                        values = self.format_treeview_values(item_data)
-                        treeview.item(item_id, values=values)
+                with self.pending_names_lock: self.pending_names.discard(appid)
+                self._mark_stage("首个名称")
+                for key, store in self.full_file_data.items():
+                    rows = store.set_game_name(appid, game_name)
+                    if not rows: continue
+                    # 名称变化会影响按游戏名排序的结果：当前列表稍后重新排序，其他列表在下次显示时排序
+                    if any(column == 'game_name' for column, _ in self.sort_specs[key]):
+                        if key == self.list_view_type: self.schedule_sort()
+                        else: self.sorted_rows.pop(key, None)
+                    treeview, view_rows = self.get_treeview(key), self.view_rows[key]
+                    for row_id in rows:
+                        record = store[row_id]; item_id = self._record_iid(key, store, record)
+                        if view_rows.get(item_id) == row_id and treeview.exists(item_id):
+                            treeview.item(item_id, values=format_treeview_values(record)); self.row_cache[key][item_id] = record
+        except queue.Empty: pass
+        finally:
+            if self.startup_timings is not None and "首个名称" in self.startup_timings and not self.pending_names and not self.pending_scans:
+                self._mark_stage("名称获取"); self._report_startup_timings()
+            self.after(200, self.process_name_queue)
+
+    def run_in_background(self, func, on_done):
+        """在后台线程执行 func，完成后在UI线程中调用 on_done(result, error)。"""
+        def worker():
+            try: self.task_queue.put((on_done, func(), None))
+            except Exception as e: self.task_queue.put((on_done, None, e))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def process_task_queue(self):
+        try:
+            while not self.task_queue.empty():
+                on_done, result, error = self.task_queue.get_nowait()
+                try: on_done(result, error)
+                except Exception as e: print(f"后台任务回调出错: {e}")
         except queue.Empty: pass
-        finally: self.after(200, self.process_name_queue)
-
-    def _name_fetcher_worker(self):
-        all_appids = {item['appid'] for key in self.full_file_data for item in self.full_file_data[key] if item['appid'].isdigit() and item['appid'] not in self.backend.name_cache}
-        if not all_appids: return
-        loop = asyncio.new_event_loop(); asyncio.set_event_loop(loop)
-        async def fetch_all():
-            tasks = [self.backend.fetch_game_name(appid) for appid in all_appids]
-            results = await asyncio.gather(*tasks)
-            for appid, name in zip(all_appids, results): self.name_queue.put((appid, name))
-        try: loop.run_until_complete(fetch_all())
-        finally: loop.close()
-
-    def start_name_fetching_thread(self):
-        if self.fetcher_thread and self.fetcher_thread.is_alive(): return
-        self.fetcher_thread = threading.Thread(target=self._name_fetcher_worker, daemon=True); self.fetcher_thread.start()
-
-    def _create_treeview_in_frame(self, parent_frame: ttk.Frame) -> ttk.Treeview:
+        finally: self.after(100, self.process_task_queue)
+
+    def request_game_names(self, appids):
+        """提交名称查询。线程安全，扫描线程每发现一个AppID即可调用。"""
+        if isinstance(appids, str): appids = (appids,)
+        with self.pending_names_lock:
+            new_appids = [appid for appid in appids if appid.isdigit() and appid not in self.backend.name_cache and appid not in self.pending_names]
+            self.pending_names.update(new_appids)
+        for appid in new_appids: asyncio.run_coroutine_threadsafe(self._fetch_name(appid), self.fetch_loop)
+
+    async def _fetch_name(self, appid: str):
+        async with self.fetch_semaphore:
+            self.name_queue.put((appid, await self.backend.fetch_game_name(appid)))
+
+    def _timed(self, stage: str, func):
+        """包装 func，在启动阶段记录其起止时间。"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter() - self.start_time
+            try: return func(*args, **kwargs)
+            finally:
+                if self.startup_timings is not None: self.startup_timings[stage] = (start, time.perf_counter() - self.start_time)
+        return wrapper
+
+    def _mark_stage(self, stage: str):
+        if self.startup_timings is not None and stage not in self.startup_timings:
+            now = time.perf_counter() - self.start_time; self.startup_timings[stage] = (now, now)
+
+    def _report_startup_timings(self):
+        timings, self.startup_timings = self.startup_timings, None
+        print("[INFO] 启动阶段耗时（相对启动时间）:")
+        for stage, (start, end) in sorted(timings.items(), key=lambda item: item[1]):
+            print(f"    {stage:<12} {start:7.3f}s -> {end:7.3f}s  ({end - start:.3f}s)")
+
+    COLUMN_TITLES = {'status': '状态', 'filename': '文件名', 'appid': 'AppID', 'game_name': '游戏名'}
+
+    def _create_treeview_in_frame(self, parent_frame: ttk.Frame, list_type: str) -> ttk.Treeview:
         columns = ('status', 'filename', 'appid', 'game_name')
         tree = ttk.Treeview(parent_frame, columns=columns, show='headings', selectmode='extended')
-        tree.heading('status', text='状态', anchor='w'); tree.heading('filename', text='文件名', anchor='w')
-        tree.heading('appid', text='AppID', anchor='w'); tree.heading('game_name', text='游戏名', anchor='w')
+        for column in columns:
+            tree.heading(column, text=self.COLUMN_TITLES[column], anchor='w', command=lambda c=column: self.on_heading_click(list_type, c))
         tree.column('status', width=80, stretch=False, anchor='w'); tree.column('filename', width=250, stretch=False, anchor='w')
         tree.column('appid', width=120, stretch=False, anchor='w'); tree.column('game_name', width=400, anchor='w')
         scrollbar = ttk.Scrollbar(parent_frame, orient=VERTICAL, command=tree.yview); tree.configure(yscrollcommand=scrollbar.set)
@@ -318,9 +472,15 @@ class FileManagerGUI(ttk.Window):
         return tree
 
     def initialize_app(self):
-        self.backend.load_config()
-        steam_path = self.backend.detect_steam_path()
-        if not steam_path or not steam_path.exists():
+        """在后台读取配置并检测Steam路径，路径确定后立即开始扫描各目录。"""
+        def detect():
+            self.backend.load_config(); return self.backend.detect_steam_path()
+        self.status_bar.config(text=" 正在检测Steam路径...")
+        self.run_in_background(self._timed("路径检测", detect), self._on_steam_path_detected)
+
+    def _on_steam_path_detected(self, steam_path: Path | None, error: Exception | None):
+        self.steam_path_detected = True; self.backend.steam_path = steam_path or Path()
+        if error or not steam_path or not steam_path.exists():
             self.status_bar.config(text="❌ 未找到Steam路径！请在“设置”中指定。")
             if not self.backend.app_config.get("Custom_Steam_Path"): messagebox.showwarning("未找到Steam", "无法自动检测到Steam路径。\n请点击“设置”按钮手动指定。")
         else: self.status_bar.config(text=f"✅ Steam路径: {steam_path}")
@@ -336,157 +496,209 @@ class FileManagerGUI(ttk.Window):
         except tk.TclError: pass
         return None, None, ""
 
-    def refresh_file_lists(self):
-        for key in self.full_file_data: self.full_file_data[key].clear()
-        self._load_data_from_disk_st()
-        assistant_files_found = self._load_data_from_disk("assistant", self.backend.get_steamtools_plugin_path(), ".o")
-        gl_files_found = self._load_data_from_disk("gl", self.backend.get_greenluma_applist_path(), ".txt")
-        self._toggle_tab(self.assistant_tab, "已入库文件 (入库助手)", assistant_files_found)
-        self._toggle_tab(self.gl_tab, "已入库文件 (GreenLuma)", gl_files_found)
-        if self.file_menu: self.file_menu.entryconfig(self.gl_folder_label, state="normal" if gl_files_found else "disabled")
-        self.filter_list(); self.start_name_fetching_thread()
-        
-    def format_treeview_values(self, data_item):
-        status_map = {'unlocked_only': "仅解锁", 'core_file': "仅解锁储存lua", 'ok': "已入库"}
-        status_text = status_map.get(data_item.get('status'), "")
-        return (status_text, data_item.get('filename', 'N/A'), data_item.get('appid', 'N/A'), data_item.get('game_name', 'Loading...'))
+    def load_snapshot_async(self):
+        """在后台读取库存快照（含名称缓存），与Steam路径检测并行进行。"""
+        self.snapshot_future = Future()
+        def load():
+            snapshot = None
+            try: snapshot = self._timed("缓存加载", self.backend.load_snapshot)()
+            finally: self.snapshot_future.set_result(snapshot)
+            return snapshot
+        self.run_in_background(load, self._on_snapshot_loaded)
+
+    def _on_snapshot_loaded(self, snapshot: dict | None, error: Exception | None):
+        """先显示快照中的库存；已由扫描结果填充的列表不会被旧数据覆盖。"""
+        if not snapshot: return
+        if not self.steam_path_detected and snapshot.get("steam_path") not in ("", "."): self.backend.steam_path = Path(snapshot["steam_path"])
+        for list_type, store in snapshot["tabs"].items():
+            if list_type in self.full_file_data and list_type not in self.scanned_types: self.full_file_data[list_type] = store
+        if "assistant" not in self.scanned_types: self._toggle_tab(self.assistant_tab, "已入库文件 (入库助手)", bool(self.full_file_data['assistant']))
+        if "gl" not in self.scanned_types: self._toggle_tab(self.gl_tab, "已入库文件 (GreenLuma)", bool(self.full_file_data['gl']))
+        self.filter_list(); self._mark_stage("首屏列表")
+        if not self.steam_path_detected: self.status_bar.config(text=" 已载入上次的库存快照，正在后台同步...")
+
+    def _previous_mtimes(self, list_type: str) -> dict[str, tuple[float, str]]:
+        """上次扫描得到的 {文件名: (mtime, AppID)}；启动时列表尚未载入则等待并使用快照。在扫描线程中调用。"""
+        store = self.full_file_data[list_type]
+        if not store and self.snapshot_future is not None:
+            snapshot = self.snapshot_future.result()
+            if snapshot: store = snapshot["tabs"].get(list_type, store)
+        return {record.filename: (record.mtime, record.appid) for record in store if record.mtime}
+
+    def refresh_file_lists(self, list_types: list[str] | None = None):
+        """
+        把列表标记为需要重新加载（默认全部）。只立即扫描当前显示的列表，
+        其余列表在首次切换到时再加载；标签页是否显示由廉价的目录探测决定。
+        """
+        for list_type in list_types or self.full_file_data:
+            if list_type in self.tab_dirty: self.tab_dirty[list_type] = True
+        self.run_in_background(self.backend.probe_tabs, self._apply_tab_probe)
+        _, _, active_type = self.get_active_context()
+        if active_type and self.tab_dirty[active_type]: self.load_tab(active_type)
+
+    def _apply_tab_probe(self, found: dict | None, error: Exception | None):
+        if error: return
+        self._toggle_tab(self.assistant_tab, "已入库文件 (入库助手)", found["assistant"])
+        self._toggle_tab(self.gl_tab, "已入库文件 (GreenLuma)", found["gl"])
+        if self.file_menu: self.file_menu.entryconfig(self.gl_folder_label, state="normal" if found["gl"] else "disabled")
+
+    def tab_needs_load(self, list_type: str) -> bool:
+        return self.tab_dirty[list_type] or self.tab_signature.get(list_type) != self.backend.directory_signature(list_type)
+
+    def load_tab(self, list_type: str):
+        """在后台扫描单个列表的目录，完成后只在内容变化时应用。"""
+        self.tab_dirty[list_type] = False
+        self.tab_generation[list_type] += 1; generation = self.tab_generation[list_type]
+        scans = {
+            "st": lambda: self.backend.scan_steamtools(self._previous_mtimes("st"), self.request_game_names),
+            "gl": lambda: self.backend.scan_greenluma(self._previous_mtimes("gl"), self.request_game_names),
+            "assistant": lambda: self.backend.scan_assistant(self.request_game_names),
+        }
+        def scan():
+            # 先记录目录签名再扫描，扫描期间发生的变化会在下次检查时被发现
+            return self.backend.directory_signature(list_type), scans[list_type]()
+        self.pending_scans += 1
+        self.run_in_background(self._timed(f"扫描 {list_type}", scan),
+                               lambda result, error: self._apply_scan_result(generation, list_type, result, error))
+
+    def _apply_scan_result(self, generation: int, list_type: str, result: tuple | None, error: Exception | None):
+        self.pending_scans -= 1
+        if generation == self.tab_generation[list_type]:  # 否则已有更新的加载请求
+            self.scanned_types.add(list_type)
+            if error: messagebox.showerror("错误", f"扫描目录失败: {error}")
+            else:
+                signature, (found, store, errors) = result
+                self.tab_signature[list_type] = signature
+                for msg in errors: messagebox.showerror("读取错误", msg)
+                if self._merge_entries(list_type, store): self.changed_since_save = True
+                if list_type == "assistant": self._toggle_tab(self.assistant_tab, "已入库文件 (入库助手)", found)
+                elif list_type == "gl": self._toggle_tab(self.gl_tab, "已入库文件 (GreenLuma)", found)
+                _, _, active_type = self.get_active_context()
+                if active_type == list_type and self.rendered_state.get(list_type) != (self.full_file_data[list_type], self.search_var.get()):
+                    self.filter_list(); self._mark_stage("首屏列表")
+        if self.pending_scans: return
+        if self.changed_since_save:
+            self.changed_since_save = False; snapshot_data = dict(self.full_file_data)
+            self.run_in_background(lambda: self.backend.save_snapshot(snapshot_data), lambda result, error: None)
+        if self.startup_timings is not None:
+            self._mark_stage("扫描完成")
+            if not self.pending_names: self._report_startup_timings()
+
+    def _merge_entries(self, list_type: str, store: InventoryStore) -> bool:
+        """用扫描结果替换列表数据；内容与修改时间都未变化时保持原样并返回 False。"""
+        if self.full_file_data[list_type].same_entries(store): return False
+        for record in store: self.backend.fill_game_name(record)
+        self.full_file_data[list_type] = store
+        return True
+
+    def get_treeview(self, list_type: str) -> ttk.Treeview:
+        return {"st": self.st_file_list, "gl": self.gl_file_list, "assistant": self.assistant_file_list}[list_type]
+
+    def _record_iid(self, list_type: str, store: InventoryStore, record: InventoryRecord) -> str:
+        """ST/GreenLuma 的行以 AppID 为 iid，GL 槽位重新编号后选择仍跟随原来的游戏；AppID 无效或重复时退回文件名。"""
+        if list_type != 'assistant' and record.appid.isdigit() and len(store.rows_by_appid[record.appid]) == 1: return record.appid
+        return record.filename
 
     def filter_list(self):
         treeview, _, list_type = self.get_active_context()
         if not list_type: return
         search_term = self.search_var.get().lower()
-        source_data = self.full_file_data[list_type]
-        treeview.delete(*treeview.get_children()); self.list_view_data.clear()
-        if not source_data:
-            treeview.insert("", tk.END, values=("", " (列表为空)", "", "")); return
-        for data_item in source_data:
-            filename, appid, game_name = data_item.get('filename', ''), data_item.get('appid', ''), data_item.get('game_name', '')
-            if search_term in filename.lower() or search_term in appid.lower() or search_term in game_name.lower():
-                values = self.format_treeview_values(data_item)
-                item_id = appid if list_type == 'st' and appid != "N/A" else filename
-                tags = ()
-                status = data_item.get('status')
-                if status == 'unlocked_only': tags = ("UNLOCKED_ONLY",)
-                elif status == 'core_file': tags = ("CORE_FILE",)
-                treeview.insert("", tk.END, iid=item_id, values=values, tags=tags)
-                if appid.isdigit(): self.list_view_data[appid] = {'treeview': treeview, 'item_id': item_id, **data_item}
-                
+        store, view_rows = self.full_file_data[list_type], self.view_rows[list_type]
+        sorted_rows = self.sorted_rows.get(list_type)
+        sort_stale = bool(self.sort_specs[list_type]) and not (sorted_rows and sorted_rows[0] is store)
+        if sorted_rows and sorted_rows[0] is store: row_ids = sorted_rows[1]
+        elif sort_stale: row_ids = self._carry_forward_order(list_type, store)  # 新的排序结果到达前不打乱已显示的行
+        else: row_ids = range(len(store))
+        view_rows.clear(); self.list_view_type = list_type
+        self.rendered_state[list_type] = (store, self.search_var.get())
+        desired = [EMPTY_ROW_IID] if not store else []
+        for row_id in row_ids:
+            record = store[row_id]
+            if search_term in record.filename.lower() or search_term in record.appid.lower() or search_term in record.game_name.lower():
+                item_id = self._record_iid(list_type, store, record)
+                desired.append(item_id); view_rows[item_id] = row_id
+        # 只增删改有变化的行，保留选择、滚动位置以及名称更新所引用的 iid；显示值只为插入或变化的行生成
+        reconcile_treeview(treeview, self.row_cache[list_type], desired, lambda iid: store[view_rows[iid]] if iid in view_rows else None, render_row)
+        if sort_stale: self.schedule_sort()
+
+    def _carry_forward_order(self, list_type: str, store: InventoryStore) -> list[int]:
+        """排序结果过期时（如重新扫描后）的临时顺序：已显示的行保持当前的先后顺序，新出现的行按扫描顺序排在后面。"""
+        rows_by_iid = {self._record_iid(list_type, store, record): row_id for row_id, record in enumerate(store)}
+        order = [rows_by_iid.pop(iid) for iid in self.view_rows[list_type] if iid in rows_by_iid]
+        order.extend(rows_by_iid.values())
+        return order
+
+    def on_heading_click(self, list_type: str, column: str):
+        """点击列标题：该列成为主排序键（再次点击切换升降序），之前的排序键作为次要键保留。"""
+        spec = self.sort_specs[list_type]
+        if spec and spec[0][0] == column: spec[0] = (column, not spec[0][1])
+        else: spec[:] = [(column, False)] + [item for item in spec if item[0] != column][:2]
+        treeview = self.get_treeview(list_type)
+        for col, title in self.COLUMN_TITLES.items():
+            arrow = (" ▼" if spec[0][1] else " ▲") if col == column else ""
+            treeview.heading(col, text=title + arrow)
+        self.sorted_rows.pop(list_type, None); self.sort_pending = False; self.apply_sort()
+
+    def schedule_sort(self):
+        """合并短时间内的多次排序请求（例如名称陆续返回时）。"""
+        if self.sort_pending: return
+        self.sort_pending = True; self.after(300, self.apply_sort)
+
+    def apply_sort(self):
+        self.sort_pending = False
+        list_type = self.list_view_type
+        if not list_type or not self.sort_specs[list_type]: return
+        store, spec = self.full_file_data[list_type], list(self.sort_specs[list_type])
+        self.sort_generation += 1; generation = self.sort_generation
+        self.run_in_background(lambda: sort_rows(store, range(len(store)), spec),
+                               lambda rows, error: self._apply_sorted_rows(generation, list_type, store, rows, error))
+
+    def _apply_sorted_rows(self, generation: int, list_type: str, store: InventoryStore, rows: list[int] | None, error: Exception | None):
+        if error: print(f"排序失败: {error}"); return
+        if generation != self.sort_generation or self.full_file_data[list_type] is not store: return
+        self.sorted_rows[list_type] = (store, rows)
+        if self.list_view_type == list_type: self.filter_list()  # 按新顺序协调，只移动位置变化的行
+
     def clear_search(self): self.search_var.set("")
-    def on_tab_change(self, event): self.filter_list()
+    def on_tab_change(self, event):
+        """切换标签页：列表未加载或其目录有变化时才扫描；数据和搜索词都没变时保留已有的行，不重建。"""
+        _, _, list_type = self.get_active_context()
+        if not list_type: return
+        self.list_view_type = list_type
+        # Steam路径确定之前只显示快照数据，路径确定后由 refresh_file_lists 统一加载
+        if self.steam_path_detected and self.tab_needs_load(list_type): self.load_tab(list_type)
+        if self.rendered_state.get(list_type) != (self.full_file_data[list_type], self.search_var.get()): self.filter_list()
 
     def _toggle_tab(self, tab: ttk.Frame, text: str, should_be_visible: bool):
         is_visible = tab in self.notebook.tabs()
         if should_be_visible and not is_visible: self.notebook.add(tab, text=text)
         elif not should_be_visible and is_visible: self.notebook.forget(tab)
 
-    def _extract_st_appid(self, file_path: Path) -> str:
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            match = re.search(r'addappid\s*\(\s*(\d+)', content)
-            return match.group(1) if match else "N/A"
-        except Exception: return "ReadError"
-    
-    def _load_data_from_disk_st(self):
-        directory = self.backend.get_steamtools_plugin_path()
-        if not directory or not directory.exists():
-            self.full_file_data['st'] = []
-            return False
-
-        loaded_data = []
-        file_data_map = {}  # Maps appid -> data dictionary
-
-        # 1. Process all .lua files first. Their existence means 'Normal' status.
-        try:
-            lua_files = [f for f in os.listdir(directory) if f.endswith(".lua") and f != "steamtools.lua"]
-            for filename in lua_files:
-                appid = self._extract_st_appid(directory / filename)
-                if appid.isdigit():
-                    # We found a file, so it's 'ok' (Normal).
-                    file_data_map[appid] = {
-                        "filename": filename,
-                        "appid": appid,
-                        "game_name": self.backend.name_cache.get(appid, "Loading..."),
-                        "status": "ok"
-                    }
-        except Exception as e:
-            messagebox.showerror("错误", f"读取stplug-in目录失败: {e}")
-
-        # 2. Process steamtools.lua for 'Unlocked Only' entries and the core file itself.
-        st_lua_path = directory / "steamtools.lua"
-        if st_lua_path.exists():
-            # Add the core file entry first.
-            loaded_data.append({
-                "filename": "steamtools.lua",
-                "appid": "N/A",
-                "game_name": "SteamTools Core File",
-                "status": "core_file"
-            })
-            try:
-                content = st_lua_path.read_text(encoding='utf-8', errors='ignore')
-                unlocked_appids = set(re.findall(r'addappid\s*\(\s*(\d+)\s*,\s*1\s*\)', content))
-
-                # 3. Find appids that are unlocked but have no corresponding .lua file.
-                for appid in unlocked_appids:
-                    if appid not in file_data_map:
-                        # This is an 'Unlocked Only' case.
-                        file_data_map[appid] = {
-                            "filename": f"缺少 {appid}.lua",
-                            "appid": appid,
-                            "game_name": self.backend.name_cache.get(appid, "Loading..."),
-                            "status": "unlocked_only"
-                        }
-            except Exception as e:
-                messagebox.showerror("错误", f"读取 steamtools.lua 失败: {e}")
-
-        # 4. Combine and sort the final list.
-        # Start with the core file (already in loaded_data)
-        # Then add all other items from our map, sorted by appid.
-        all_items = sorted(file_data_map.values(), key=lambda item: int(item['appid']), reverse=True)
-        loaded_data.extend(all_items)
-
-        self.full_file_data['st'] = loaded_data
-        return True
-
-    def _load_data_from_disk(self, list_type: str, directory: Path | None, extension: str) -> bool:
-        if list_type == 'st': return self._load_data_from_disk_st()
-        if not directory or not directory.exists(): self.full_file_data[list_type] = []; return False
-        try:
-            files = sorted([f for f in os.listdir(directory) if f.endswith(extension)], key=lambda f: (directory / f).stat().st_mtime, reverse=True)
-            if not files: self.full_file_data[list_type] = []; return False
-            loaded_data = []
-            for filename in files:
-                appid = Path(filename).stem; game_name = self.backend.name_cache.get(appid, "Loading...")
-                loaded_data.append({"filename": filename, "appid": appid, "game_name": game_name, "status": "ok"})
-            self.full_file_data[list_type] = loaded_data; return True
-        except Exception as e:
-            messagebox.showerror("读取错误", f"读取目录 {directory} 时发生错误:\n{e}")
-            self.full_file_data[list_type] = []; return False
-
-    def get_selected_data_items(self) -> list[dict]:
+    def get_selected_data_items(self) -> list[InventoryRecord]:
         treeview, _, list_type = self.get_active_context()
         if not treeview: return []
-        selected_iids = treeview.selection()
-        source_data = self.full_file_data[list_type]
-        if list_type == 'st': return [item for item in source_data if (item['appid'] in selected_iids or item['filename'] in selected_iids)]
-        else: return [item for item in source_data if item['filename'] in selected_iids]
+        store, view_rows = self.full_file_data[list_type], self.view_rows[list_type]
+        return [store[view_rows[iid]] for iid in treeview.selection() if iid in view_rows]
 
     def delete_selected_file(self):
         _, directory, list_type = self.get_active_context()
         selected_items = self.get_selected_data_items()
         if not selected_items: messagebox.showinfo("提示", "请先在列表中选择要删除的条目。", parent=self); return
-        if not directory and any(item.get('status') != 'unlocked_only' for item in selected_items): return
+        if not directory and any(item.status != 'unlocked_only' for item in selected_items): return
         st_warning = "\n\n对于SteamTools条目，其关联的脚本文件、清单文件以及解锁条目都将被彻底删除。" if list_type == 'st' else ""
         msg = f"确定要删除这 {len(selected_items)} 个条目吗？\n此操作不可恢复！{st_warning}"
         if not messagebox.askyesno("确认删除", msg, parent=self): return
+        if list_type == 'gl':
+            self._modify_greenluma_applist(remove=[item.appid for item in selected_items]); return
         deleted_count, failed_files, manifests_deleted_count, unlocked_removed_count = 0, [], 0, 0
         depotcache_path = self.backend.steam_path / 'config' / 'depotcache'
         for item in selected_items:
-            filename = item.get('filename')
+            filename = item.filename
             if filename and "缺少" not in filename:
                 try:
                     file_path = directory / filename
                     if file_path.exists():
-                        if list_type == 'st' and item.get('status') != 'core_file':
+                        if list_type == 'st' and item.status != 'core_file':
                             try:
                                 content = file_path.read_text(encoding='utf-8', errors='ignore')
                                 gids = re.findall(r'setManifestid\s*\(\s*\d+\s*,\s*"(\d+)"\s*\)', content)
@@ -497,24 +709,25 @@ class FileManagerGUI(ttk.Window):
                             except Exception as e: failed_files.append(f"{filename} (清单清理失败: {e})")
                         os.remove(file_path); deleted_count += 1
                 except Exception as e: failed_files.append(f"{filename} (删除文件时出错: {e})")
-            if list_type == 'st' and item.get('status') != 'core_file':
-                if self._modify_st_lua(item['appid'], 'remove', show_feedback=False): unlocked_removed_count += 1
+            if list_type == 'st' and item.status != 'core_file':
+                # 批量删除时不逐条刷新，循环结束后统一刷新一次
+                if self._modify_st_lua(item.appid, 'remove', show_feedback=False, refresh=False): unlocked_removed_count += 1
         success_msg = f"成功处理 {len(selected_items)} 个条目。"
         if deleted_count > 0: success_msg += f"\n- 删除了 {deleted_count} 个文件。"
         if unlocked_removed_count > 0: success_msg += f"\n- 移除了 {unlocked_removed_count} 个解锁条目。"
         if manifests_deleted_count > 0: success_msg += f"\n- 清除了 {manifests_deleted_count} 个关联清单。"
         success_msg += "\n\n请重启Steam生效。"
         if deleted_count > 0 or unlocked_removed_count > 0:
-            messagebox.showinfo("操作完成", success_msg, parent=self); self.refresh_file_lists()
+            messagebox.showinfo("操作完成", success_msg, parent=self); self.refresh_file_lists([list_type])
         if failed_files: messagebox.showwarning("部分失败", "以下文件处理失败:\n" + "\n".join(failed_files), parent=self)
 
     def view_selected_file(self):
         selected_items = self.get_selected_data_items()
         if not selected_items: messagebox.showinfo("提示", "请选择一个文件进行查看或编辑。", parent=self); return
         if len(selected_items) > 1: messagebox.showinfo("提示", "一次只能编辑一个文件。", parent=self); return
-        item = selected_items[0]; filename = item.get('filename')
+        item = selected_items[0]; filename = item.filename
         if not filename or "缺少" in filename: messagebox.showerror("错误", "此条目没有关联的物理文件可供编辑。", parent=self); return
-        _, directory, _ = self.get_active_context()
+        _, directory, list_type = self.get_active_context()
         if not directory: return
         if filename.endswith(".o"): messagebox.showwarning("注意", ".o 是二进制文件，用文本编辑器打开和保存可能会损坏文件！", parent=self)
         try:
@@ -522,11 +735,11 @@ class FileManagerGUI(ttk.Window):
             if file_path.exists():
                 with open(file_path, "rb") as f_bin: content = f_bin.read().decode('utf-8', errors='ignore')
                 SimpleNotepad(self, filename, content, str(file_path))
-            else: messagebox.showerror("错误", f"文件 '{filename}' 已不存在。", parent=self); self.refresh_file_lists()
+            else: messagebox.showerror("错误", f"文件 '{filename}' 已不存在。", parent=self); self.refresh_file_lists([list_type])
         except Exception as e: messagebox.showerror("读取错误", f"读取文件失败: {e}", parent=self)
 
-    def check_depot_list(self, item: dict):
-        filename = item.get('filename')
+    def check_depot_list(self, item: InventoryRecord):
+        filename = item.filename
         if not filename or "缺少" in filename: messagebox.showerror("错误", "没有可供检查的LUA文件。", parent=self); return
         _, directory, _ = self.get_active_context();
         if not directory: return
@@ -538,24 +751,54 @@ class FileManagerGUI(ttk.Window):
             DepotListDialog(self, pattern.findall(content), filename)
         except Exception as e: messagebox.showerror("解析失败", f"读取或解析文件时出错: {e}", parent=self)
 
-    def toggle_manifest_version(self, item: dict, to_fixed: bool):
-        filename = item.get('filename')
+    def toggle_manifest_version(self, item: InventoryRecord, to_fixed: bool):
+        filename = item.filename
         if not filename or "缺少" in filename: messagebox.showerror("错误", "没有可供操作的LUA文件。", parent=self); return
-        _, directory, _ = self.get_active_context();
-        if not directory: return
-        file_path = directory / filename
-        if not file_path.exists(): messagebox.showerror("错误", f"文件 '{filename}' 不存在。", parent=self); return
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            if to_fixed:
-                new_content = re.sub(r'--\s*(setManifestid\s*\()', r'\1', content); action_text = "固定版本"
-            else:
-                new_content = re.sub(r'^(setManifestid\s*\()', r'--\1', content, flags=re.MULTILINE); action_text = "自动更新"
-            if content == new_content: messagebox.showinfo("无变化", "文件内容无需更改。", parent=self); return
-            file_path.write_text(new_content, encoding='utf-8')
-            messagebox.showinfo("成功", f"文件 '{filename}' 已成功转换为 {action_text} 模式。", parent=self)
-            self.refresh_file_lists()
-        except Exception as e: messagebox.showerror("操作失败", f"处理文件时出错: {e}", parent=self)
+        self.bulk_toggle_manifest_version([item], to_fixed)
+
+    def bulk_toggle_manifest_version(self, items: list[InventoryRecord] | None, to_fixed: bool):
+        """批量切换清单版本模式。items 为 None 时处理 SteamTools 目录下的全部lua文件（在后台线程中列出目录，不依赖可能过期的列表数据）。"""
+        if self.manifest_job_running: messagebox.showinfo("提示", "清单转换任务正在进行中，请稍候。", parent=self); return
+        directory = self.backend.get_steamtools_plugin_path()
+        if not directory or not directory.exists(): messagebox.showerror("错误", "无法找到SteamTools插件目录。", parent=self); return
+        filenames = None
+        if items is not None:
+            filenames = [item.filename for item in items if item.filename and "缺少" not in item.filename and item.status != 'core_file']
+            if not filenames: messagebox.showinfo("提示", "没有可供操作的LUA文件。", parent=self); return
+        action_text = "固定版本" if to_fixed else "自动更新"
+
+        def convert_one(filename):
+            try: return filename, set_manifest_mode(directory / filename, to_fixed), None
+            except Exception as e: return filename, False, e
+
+        def convert_all():
+            names = filenames
+            if names is None:
+                with os.scandir(directory) as it:
+                    names = sorted(entry.name for entry in it if entry.name.endswith(".lua") and entry.name != "steamtools.lua" and entry.is_file())
+            if not names: return []
+            with ThreadPoolExecutor(max_workers=min(8, len(names))) as pool:
+                return list(pool.map(convert_one, names))
+
+        def on_done(results, error):
+            self.manifest_job_running = False
+            if error: messagebox.showerror("操作失败", f"处理文件时出错: {error}", parent=self); return
+            if not results: self.status_bar.config(text=" 清单转换完成：没有可供操作的LUA文件。"); messagebox.showinfo("提示", "没有可供操作的LUA文件。", parent=self); return
+            changed = [f for f, ok, e in results if ok]
+            failed = [f"{f} ({e})" for f, ok, e in results if e]
+            unchanged_count = len(results) - len(changed) - len(failed)
+            self.status_bar.config(text=f" 清单转换完成：{len(changed)} 个文件已转换为{action_text}模式。")
+            if len(results) == 1 and not failed:
+                if changed: messagebox.showinfo("成功", f"文件 '{changed[0]}' 已成功转换为 {action_text} 模式。", parent=self)
+                else: messagebox.showinfo("无变化", "文件内容无需更改。", parent=self)
+                return
+            msg = f"共处理 {len(results)} 个文件：\n- 转换为{action_text}: {len(changed)}\n- 无需更改: {unchanged_count}"
+            if failed: msg += f"\n- 失败: {len(failed)}\n\n" + "\n".join(failed[:20])
+            (messagebox.showwarning if failed else messagebox.showinfo)("操作完成", msg, parent=self)
+
+        self.manifest_job_running = True
+        self.status_bar.config(text=f" 正在将{'全部' if filenames is None else f' {len(filenames)} 个'}文件转换为{action_text}模式...")
+        self.run_in_background(convert_all, on_done)
 
     def manual_modify_unlock(self, action: str):
         title = "强制解锁AppID" if action == 'add' else "删除解锁AppID"
@@ -566,7 +809,37 @@ class FileManagerGUI(ttk.Window):
         elif appid:
             messagebox.showerror("输入无效", "请输入一个有效的数字AppID。", parent=self)
 
-    def _modify_st_lua(self, appid: str, action: str, show_feedback=True) -> bool:
+    def manual_modify_greenluma(self, action: str):
+        title = "添加GreenLuma AppID" if action == 'add' else "删除GreenLuma AppID"
+        prompt = "请输入AppID（可输入多个，用空格或逗号分隔）:"
+        text = simpledialog.askstring(title, prompt, parent=self)
+        if not text: return
+        appids = [a for a in re.split(r'[\s,，]+', text) if a]
+        if not appids or not all(a.isdigit() for a in appids):
+            messagebox.showerror("输入无效", "请输入有效的数字AppID。", parent=self); return
+        if action == 'add': self._modify_greenluma_applist(add=appids)
+        else: self._modify_greenluma_applist(remove=appids)
+
+    def _modify_greenluma_applist(self, add: list[str] = (), remove: list[str] = ()) -> bool:
+        directory = self.backend.get_greenluma_applist_path()
+        if not directory:
+            messagebox.showerror("错误", "无法找到GreenLuma AppList目录。", parent=self); return False
+        try:
+            applist = GreenLumaAppList(directory); applist.load()
+            added_count, removed_count, cleaned_count, written_count = applist.apply_changes(add=add, remove=remove)
+        except (IOError, OSError, PermissionError) as e:
+            messagebox.showerror("文件操作失败", f"无法修改 AppList: {e}\n\n请尝试以管理员身份运行本程序。", parent=self)
+            self.refresh_file_lists(["gl"]); return False
+        if not written_count:
+            messagebox.showinfo("提示", "AppList 无需更改。", parent=self); return False
+        msg = "AppList 已更新并重新编号。"
+        if added_count: msg += f"\n- 添加了 {added_count} 个AppID。"
+        if removed_count: msg += f"\n- 移除了 {removed_count} 个槽位。"
+        if cleaned_count: msg += f"\n- 清理了 {cleaned_count} 个重复或无效的槽位。"
+        messagebox.showinfo("操作完成", msg + "\n\n请重启Steam生效。", parent=self)
+        self.refresh_file_lists(["gl"]); return True
+
+    def _modify_st_lua(self, appid: str, action: str, show_feedback=True, refresh=True) -> bool:
         st_dir = self.backend.get_steamtools_plugin_path()
         if not st_dir:
             if show_feedback: messagebox.showerror("错误", "无法找到SteamTools插件目录。")
@@ -596,7 +869,7 @@ class FileManagerGUI(ttk.Window):
             if show_feedback:
                 if action == 'add': messagebox.showinfo("成功", f"AppID {appid} 已成功解锁。", parent=self)
                 elif action == 'remove': messagebox.showinfo("成功", f"AppID {appid} 的解锁条目已移除。", parent=self)
-            self.refresh_file_lists()
+            if refresh: self.refresh_file_lists(["st"])
             return True
         except (IOError, OSError, PermissionError) as e:
             if show_feedback: messagebox.showerror("文件操作失败", f"无法修改 steamtools.lua: {e}\n\n请尝试以管理员身份运行本程序。")
@@ -604,14 +877,14 @@ class FileManagerGUI(ttk.Window):
             if show_feedback: messagebox.showerror("未知错误", f"修改 steamtools.lua 时发生未知错误: {e}")
         return False
 
-    def install_game(self, item: dict | None = None):
+    def install_game(self, item: InventoryRecord | None = None):
         if not item:
             selected_items = self.get_selected_data_items()
             item = selected_items[0] if selected_items else None
         if not item: return
-        appid = item.get('appid')
+        appid = item.appid
         if appid and appid.isdigit(): webbrowser.open(f"steam://install/{appid}")
-        else: messagebox.showinfo("提示", f"条目 '{item.get('filename')}' 没有有效的AppID可供安装。", parent=self)
+        else: messagebox.showinfo("提示", f"条目 '{item.filename}' 没有有效的AppID可供安装。", parent=self)
 
     def show_file_context_menu(self, event):
         treeview, _, list_type = self.get_active_context()
@@ -624,9 +897,13 @@ class FileManagerGUI(ttk.Window):
         selected_items = self.get_selected_data_items()
         if not selected_items: return
         menu = tk.Menu(self, tearoff=0)
+        if len(selected_items) > 1 and list_type == 'st':
+            menu.add_command(label=f"✅ 转换为固定版本 ({len(selected_items)})", command=lambda i=selected_items: self.bulk_toggle_manifest_version(i, to_fixed=True))
+            menu.add_command(label=f"🔄 转换为自动更新 ({len(selected_items)})", command=lambda i=selected_items: self.bulk_toggle_manifest_version(i, to_fixed=False))
+            menu.add_separator()
         if len(selected_items) == 1:
             item = selected_items[0]
-            filename, appid, status = item.get('filename'), item.get('appid'), item.get('status')
+            filename, appid, status = item.filename, item.appid, item.status
             if appid and appid.isdigit():
                 menu.add_command(label=f"🚀 运行/安装此游戏 ({appid})", command=lambda i=item: self.install_game(i))
                 menu.add_command(label=f"📚 在Steam库中查看", command=lambda i=item: self.view_in_steam_library(i))
@@ -656,11 +933,11 @@ class FileManagerGUI(ttk.Window):
         menu.tk_popup(event.x_root, event.y_root)
 
     def locate_file(self, filename: str):
-        _, directory, _ = self.get_active_context()
+        _, directory, list_type = self.get_active_context()
         if not directory: return
         file_path = str(directory / filename)
         if os.path.exists(file_path): subprocess.run(['explorer', '/select,', file_path])
-        else: messagebox.showerror("错误", "文件不存在。", parent=self); self.refresh_file_lists()
+        else: messagebox.showerror("错误", "文件不存在。", parent=self); self.refresh_file_lists([list_type])
 
     def open_folder(self, folder_type: str):
         path = None
@@ -669,14 +946,14 @@ class FileManagerGUI(ttk.Window):
         if path and path.exists(): os.startfile(path)
         else: messagebox.showerror("错误", "无法定位文件夹，它可能不存在。", parent=self)
 
-    def view_in_steam_library(self, item: dict | None = None):
+    def view_in_steam_library(self, item: InventoryRecord | None = None):
         if not item:
             selected_items = self.get_selected_data_items()
             item = selected_items[0] if selected_items else None
         if not item: return
-        appid = item.get('appid')
+        appid = item.appid
         if appid and appid.isdigit(): webbrowser.open(f"steam://nav/games/details/{appid}")
-        else: messagebox.showinfo("提示", f"条目 '{item.get('filename')}' 没有有效的AppID。", parent=self)
+        else: messagebox.showinfo("提示", f"条目 '{item.filename}' 没有有效的AppID。", parent=self)
 
     def show_about_dialog(self):
         messagebox.showinfo("关于", "cai入库文件管理器V2 1.3by pvzcxw\n\n"
@@ -689,5 +966,7 @@ if __name__ == '__main__':
     try:
         from ctypes import windll; windll.shcore.SetProcessDpiAwareness(1)
     except: pass
+    try: locale.setlocale(locale.LC_COLLATE, '')  # 游戏名排序使用系统区域设置
+    except locale.Error: pass
     app = FileManagerGUI()
     app.mainloop()
\ No newline at end of file